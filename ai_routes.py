@@ -8,9 +8,10 @@ from typing import Any, Dict, List, Tuple, Optional
 from flask import Blueprint, request, jsonify, Response, stream_with_context
 import redis
 from openai import OpenAI
-from langchain_openai import OpenAIEmbeddings
 from langchain_chroma import Chroma
 
+from embeddings import get_embedding, check_index_embedder
+
 # -------------------- setup --------------------
 ai_bp = Blueprint("ai", __name__)
 
@@ -22,9 +23,10 @@ if not OPENAI_API_KEY or not OPENAI_MODEL or not REDIS_URL:
 
 client = OpenAI(api_key=OPENAI_API_KEY)
 
-# Vector store (persisted)
-embedding = OpenAIEmbeddings(api_key=OPENAI_API_KEY, model="text-embedding-3-small")
+# Vector store (persisted); EMBEDDING_PROVIDER picks openai or local ONNX
+embedding = get_embedding()
 vectorstore = Chroma(persist_directory="chroma_store", embedding_function=embedding)
+check_index_embedder("chroma_store", embedding, vectorstore._collection.count())
 
 # Redis
 redis_client = redis.from_url(REDIS_URL, decode_responses=True)
@@ -0,0 +1,175 @@
+# embeddings.py
+import os, json, hashlib
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+# -------------------- config --------------------
+EMBEDDING_PROVIDER   = os.getenv("EMBEDDING_PROVIDER", "openai").strip().lower()   # openai | local
+OPENAI_EMBED_MODEL   = os.getenv("OPENAI_EMBED_MODEL", "text-embedding-3-small").strip()
+LOCAL_EMBED_DIR      = os.getenv("LOCAL_EMBED_DIR", "models/all-MiniLM-L6-v2").strip()
+LOCAL_EMBED_FILE     = os.getenv("LOCAL_EMBED_FILE", "model_quantized.onnx").strip()
+LOCAL_EMBED_MAX_LEN  = int(os.getenv("LOCAL_EMBED_MAX_LEN", "256"))
+EMBED_BATCH_SIZE     = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+EMBED_THREADS        = int(os.getenv("EMBED_THREADS", "0")) or (os.cpu_count() or 1)
+
+EMBEDDER_META_FILE = "embedder.json"
+
+# Stores built before the provider switch have no metadata file; they were all
+# embedded with this model.
+LEGACY_EMBEDDER = {"provider": "openai", "model": "text-embedding-3-small"}
+
+def _file_sha256(path: str) -> str:
+  h = hashlib.sha256()
+  with open(path, "rb") as f:
+    for block in iter(lambda: f.read(1 << 20), b""):
+      h.update(block)
+  return h.hexdigest()
+
+# -------------------- local ONNX backend --------------------
+class OnnxEmbeddings(Embeddings):
+  """Sentence embeddings on CPU via ONNX Runtime (mean pooling + L2 norm).
+
+  `session` is an onnxruntime InferenceSession and `tokenizer` a HuggingFace
+  `tokenizers.Tokenizer` with padding/truncation enabled; use `from_dir` to
+  load both from an exported model folder.
+  """
+
+  def __init__(self, session, tokenizer, model_name: str, max_length: int = 256,
+               batch_size: int = 64, fingerprint: Optional[str] = None):
+    import numpy as np
+
+    self._np = np
+    self.session = session
+    self.tokenizer = tokenizer
+    self.model_name = model_name
+    self.max_length = max_length
+    self.batch_size = max(1, batch_size)
+    self.fingerprint = fingerprint
+    self._inputs = {i.name for i in session.get_inputs()}
+    self._dim: Optional[int] = None
+    self._embed_query_cached = lru_cache(maxsize=1024)(self._embed_one)
+
+  @classmethod
+  def from_dir(cls, model_dir: str, model_file: str = "model_quantized.onnx",
+               max_length: int = 256, batch_size: int = 64, threads: int = 1) -> "OnnxEmbeddings":
+    try:
+      import onnxruntime as ort
+      from tokenizers import Tokenizer
+    except ImportError as e:
+      raise ImportError("EMBEDDING_PROVIDER=local needs numpy, onnxruntime and tokenizers installed") from e
+
+    model_path = os.path.join(model_dir, model_file)
+    tok_path = os.path.join(model_dir, "tokenizer.json")
+    if not os.path.isfile(model_path) or not os.path.isfile(tok_path):
+      raise ValueError(
+        f"Local embedder needs {model_path} and {tok_path}; run scripts/fetch_embed_model.py"
+      )
+
+    tokenizer = Tokenizer.from_file(tok_path)
+    tokenizer.enable_truncation(max_length=max_length)
+    tokenizer.enable_padding()
+
+    opts = ort.SessionOptions()
+    opts.intra_op_num_threads = threads
+    opts.inter_op_num_threads = 1
+    opts.execution_mode = ort.ExecutionMode.ORT_SEQUENTIAL
+    opts.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+    session = ort.InferenceSession(model_path, sess_options=opts, providers=["CPUExecutionProvider"])
+
+    return cls(
+      session, tokenizer,
+      model_name=os.path.basename(os.path.normpath(model_dir)) + "/" + model_file,
+      max_length=max_length, batch_size=batch_size, fingerprint=_file_sha256(model_path),
+    )
+
+  def _run(self, texts: List[str]) -> List[List[float]]:
+    np = self._np
+    encs = self.tokenizer.encode_batch(texts)
+    ids = np.asarray([e.ids for e in encs], dtype=np.int64)
+    mask = np.asarray([e.attention_mask for e in encs], dtype=np.int64)
+    feed = {"input_ids": ids, "attention_mask": mask}
+    if "token_type_ids" in self._inputs:
+      feed["token_type_ids"] = np.zeros_like(ids)
+
+    out = self.session.run(None, feed)[0]
+    if out.ndim == 3:
+      m = mask[..., None].astype(out.dtype)
+      out = (out * m).sum(axis=1) / np.clip(m.sum(axis=1), 1e-9, None)
+    out = out / np.clip(np.linalg.norm(out, axis=1, keepdims=True), 1e-12, None)
+    return out.astype(np.float32).tolist()
+
+  def _embed_one(self, text: str):
+    return tuple(self._run([text])[0])
+
+  @property
+  def dim(self) -> int:
+    if self._dim is None:
+      self._dim = len(self._embed_query_cached("dimension probe"))
+    return self._dim
+
+  def embed_documents(self, texts: List[str]) -> List[List[float]]:
+    # Batch by similar length so padding stays short, then restore input order.
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    vectors: List[Optional[List[float]]] = [None] * len(texts)
+    for start in range(0, len(order), self.batch_size):
+      idxs = order[start:start + self.batch_size]
+      for i, vec in zip(idxs, self._run([texts[i] for i in idxs])):
+        vectors[i] = vec
+    return vectors  # type: ignore[return-value]
+
+  def embed_query(self, text: str) -> List[float]:
+    return list(self._embed_query_cached(text))
+
+# -------------------- provider selection --------------------
+def get_embedding() -> Embeddings:
+  if EMBEDDING_PROVIDER == "local":
+    return OnnxEmbeddings.from_dir(
+      LOCAL_EMBED_DIR, LOCAL_EMBED_FILE,
+      max_length=LOCAL_EMBED_MAX_LEN, batch_size=EMBED_BATCH_SIZE, threads=EMBED_THREADS,
+    )
+  if EMBEDDING_PROVIDER == "openai":
+    from langchain_openai import OpenAIEmbeddings
+    return OpenAIEmbeddings(api_key=os.getenv("OPENAI_API_KEY", "").strip(), model=OPENAI_EMBED_MODEL)
+  raise ValueError(f"Unknown EMBEDDING_PROVIDER: {EMBEDDING_PROVIDER!r} (use 'openai' or 'local')")
+
+def embedder_info(embedding: Embeddings) -> Dict[str, Any]:
+  if isinstance(embedding, OnnxEmbeddings):
+    return {
+      "provider": "local",
+      "model": embedding.model_name,
+      "dim": embedding.dim,
+      "max_length": embedding.max_length,
+      "sha256": embedding.fingerprint,
+    }
+  return {"provider": "openai", "model": getattr(embedding, "model", OPENAI_EMBED_MODEL)}
+
+# -------------------- index metadata --------------------
+def read_index_embedder(persist_directory: str, n_vectors: int) -> Optional[Dict[str, Any]]:
+  """Embedder that built the store, or None if the store holds no vectors yet."""
+  if n_vectors <= 0:
+    return None
+  path = os.path.join(persist_directory, EMBEDDER_META_FILE)
+  if os.path.isfile(path):
+    with open(path, encoding="utf-8") as f:
+      return json.load(f)
+  return dict(LEGACY_EMBEDDER)
+
+def write_index_embedder(persist_directory: str, embedding: Embeddings) -> None:
+  os.makedirs(persist_directory, exist_ok=True)
+  path = os.path.join(persist_directory, EMBEDDER_META_FILE)
+  tmp = path + ".tmp"
+  with open(tmp, "w", encoding="utf-8") as f:
+    json.dump(embedder_info(embedding), f, indent=2)
+  os.replace(tmp, path)
+
+def check_index_embedder(persist_directory: str, embedding: Embeddings, n_vectors: int) -> None:
+  """Raise if the `n_vectors` already in the store were built by a different embedder."""
+  built_with = read_index_embedder(persist_directory, n_vectors)
+  current = embedder_info(embedding)
+  if built_with is not None and built_with != current:
+    raise ValueError(
+      f"Vector store '{persist_directory}' was built with {built_with}, but the current embedder is "
+      f"{current}. Delete the store and re-run scripts/ingest.py, or switch EMBEDDING_PROVIDER back."
+    )
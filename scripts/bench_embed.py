@@ -0,0 +1,31 @@
+
+from dotenv import load_dotenv
+import os
+import sys
+import time
+load_dotenv()
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from embeddings import get_embedding, embedder_info
+
+# Times uncached query embeddings for the configured EMBEDDING_PROVIDER
+runs = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+embedding = get_embedding()
+print(f"Embedder: {embedder_info(embedding)}")
+
+for i in range(5):
+    embedding.embed_query(f"warm up query {i}")
+
+timings = []
+for i in range(runs):
+    query = f"How does Nanize coating compare to PTFE on cookware, variant {i}?"
+    start = time.perf_counter()
+    embedding.embed_query(query)
+    timings.append((time.perf_counter() - start) * 1000)
+
+timings.sort()
+p50 = timings[len(timings) // 2]
+p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+print(f"{runs} queries: p50 {p50:.2f} ms, p95 {p95:.2f} ms, max {timings[-1]:.2f} ms")
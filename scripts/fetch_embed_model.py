@@ -0,0 +1,38 @@
+
+from dotenv import load_dotenv
+import os
+import sys
+load_dotenv()
+
+import requests
+
+# Quantized ONNX export of sentence-transformers/all-MiniLM-L6-v2 (384-dim)
+HF_REPO = "Xenova/all-MiniLM-L6-v2"
+FILES = {
+    "model_quantized.onnx": "onnx/model_quantized.onnx",
+    "tokenizer.json": "tokenizer.json",
+}
+
+model_dir = os.getenv("LOCAL_EMBED_DIR", "models/all-MiniLM-L6-v2").strip()
+os.makedirs(model_dir, exist_ok=True)
+
+for name, remote in FILES.items():
+    dest = os.path.join(model_dir, name)
+    if os.path.isfile(dest):
+        print(f"Already present: {dest}")
+        continue
+
+    url = f"https://huggingface.co/{HF_REPO}/resolve/main/{remote}"
+    print(f"Downloading {url}")
+    try:
+        with requests.get(url, stream=True, timeout=60) as r:
+            r.raise_for_status()
+            with open(dest + ".part", "wb") as f:
+                for chunk in r.iter_content(chunk_size=1 << 20):
+                    f.write(chunk)
+        os.replace(dest + ".part", dest)
+    except Exception as e:
+        print(f"Failed to fetch {name}: {e}")
+        sys.exit(1)
+
+print(f"Local embedding model ready in {model_dir}")
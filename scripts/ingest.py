@@ -1,19 +1,23 @@
 
 from dotenv import load_dotenv
 import os
+import sys
 load_dotenv()
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 from langchain_community.document_loaders import (
     TextLoader, PyPDFLoader, CSVLoader,
     UnstructuredWordDocumentLoader, UnstructuredMarkdownLoader
 )
 from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_openai import OpenAIEmbeddings
 from langchain_chroma import Chroma
 from langchain.docstore.document import Document
 import os
 import xml.etree.ElementTree as ET
 
+from embeddings import get_embedding, check_index_embedder, write_index_embedder
+
 
 # Define the document path
 docs_path = "docs/"
@@ -76,8 +80,12 @@ for root, _, files in os.walk(docs_path):
 text_splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=100)
 split_docs = text_splitter.split_documents(all_documents)
 
-# Embed and store in ChromaDB
-embedding = OpenAIEmbeddings(api_key=os.getenv("OPENAI_API_KEY"), model="text-embedding-3-small")
-vectorstore = Chroma.from_documents(split_docs, embedding=embedding, persist_directory="chroma_store")
+# Embed and store in ChromaDB (provider chosen by EMBEDDING_PROVIDER)
+embedding = get_embedding()
+vectorstore = Chroma(persist_directory="chroma_store", embedding_function=embedding)
+check_index_embedder("chroma_store", embedding, vectorstore._collection.count())
+# Record the embedder before writing vectors so a partial ingest is still labelled
+write_index_embedder("chroma_store", embedding)
+vectorstore.add_documents(split_docs)
 
 print("Documents ingested and stored.")
\ No newline at end of file
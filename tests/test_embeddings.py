@@ -0,0 +1,138 @@
+import json
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from embeddings import (
+  EMBEDDER_META_FILE, LEGACY_EMBEDDER, OnnxEmbeddings,
+  check_index_embedder, embedder_info, read_index_embedder, write_index_embedder,
+)
+
+# -------------------- stubs --------------------
+class StubTokenizer:
+  """One token per character, padded with 0 to the longest text in the batch."""
+
+  def encode_batch(self, texts):
+    width = max(len(t) for t in texts)
+    return [
+      SimpleNamespace(
+        ids=[ord(c) for c in t] + [0] * (width - len(t)),
+        attention_mask=[1] * len(t) + [0] * (width - len(t)),
+      )
+      for t in texts
+    ]
+
+class PooledSession:
+  """2D output: [text length, 1] so each vector identifies its input."""
+
+  def __init__(self):
+    self.batches = []
+
+  def get_inputs(self):
+    return [SimpleNamespace(name="input_ids"), SimpleNamespace(name="attention_mask")]
+
+  def run(self, _names, feed):
+    self.batches.append(feed["input_ids"].shape[0])
+    lengths = feed["attention_mask"].sum(axis=1).astype(np.float32)
+    return [np.stack([lengths, np.ones_like(lengths)], axis=1)]
+
+class TokenSession:
+  """3D output: token vectors [id, 1], with large junk on padding positions."""
+
+  def __init__(self):
+    self.feeds = []
+
+  def get_inputs(self):
+    return [SimpleNamespace(name=n) for n in ("input_ids", "attention_mask", "token_type_ids")]
+
+  def run(self, _names, feed):
+    self.feeds.append(feed)
+    ids = feed["input_ids"].astype(np.float32)
+    out = np.stack([ids, np.ones_like(ids)], axis=2)
+    out[feed["attention_mask"] == 0] = 1000.0
+    return [out]
+
+class StubOpenAI:
+  model = "text-embedding-3-small"
+
+def make(session, **kw):
+  return OnnxEmbeddings(session, StubTokenizer(), model_name="stub/model.onnx", **kw)
+
+def unit(v):
+  v = np.asarray(v, dtype=np.float64)
+  return v / np.linalg.norm(v)
+
+# -------------------- inference --------------------
+def test_embed_documents_restores_input_order_across_batches():
+  session = PooledSession()
+  emb = make(session, batch_size=2)
+  texts = ["ccccc", "a", "dddddddd", "bb", "eee"]
+
+  vectors = emb.embed_documents(texts)
+
+  assert session.batches == [2, 2, 1]
+  for text, vec in zip(texts, vectors):
+    assert vec == pytest.approx(unit([len(text), 1]).tolist(), rel=1e-6)
+
+def test_two_dimensional_output_is_only_normalised():
+  vec = make(PooledSession()).embed_query("abc")
+  assert vec == pytest.approx(unit([3, 1]).tolist(), rel=1e-6)
+
+def test_three_dimensional_output_is_mean_pooled_over_mask():
+  session = TokenSession()
+  emb = make(session)
+
+  short, long_ = emb.embed_documents(["ab", "abcd"])
+
+  assert short == pytest.approx(unit([(ord("a") + ord("b")) / 2, 1]).tolist(), rel=1e-6)
+  assert long_ == pytest.approx(unit([sum(map(ord, "abcd")) / 4, 1]).tolist(), rel=1e-6)
+  assert not session.feeds[0]["token_type_ids"].any()
+
+def test_query_cache_is_per_instance():
+  a_session, b_session = PooledSession(), PooledSession()
+  a, b = make(a_session), make(b_session)
+
+  a.embed_query("hello")
+  a.embed_query("hello")
+  b.embed_query("hello")
+
+  assert a_session.batches == [1]
+  assert b_session.batches == [1]
+
+# -------------------- index metadata --------------------
+def test_empty_store_has_no_embedder(tmp_path):
+  (tmp_path / "chroma.sqlite3").write_bytes(b"")
+  assert read_index_embedder(str(tmp_path), 0) is None
+  check_index_embedder(str(tmp_path), make(PooledSession()), 0)
+
+def test_populated_store_without_metadata_is_legacy(tmp_path):
+  assert read_index_embedder(str(tmp_path), 10) == LEGACY_EMBEDDER
+  check_index_embedder(str(tmp_path), StubOpenAI(), 10)
+  with pytest.raises(ValueError, match="built with"):
+    check_index_embedder(str(tmp_path), make(PooledSession()), 10)
+
+def test_stale_metadata_on_empty_store_does_not_block(tmp_path):
+  write_index_embedder(str(tmp_path), StubOpenAI())
+  check_index_embedder(str(tmp_path), make(PooledSession()), 0)
+
+def test_metadata_round_trip_and_mismatch(tmp_path):
+  emb = make(PooledSession(), max_length=256, fingerprint="aaa")
+  write_index_embedder(str(tmp_path), emb)
+
+  stored = json.loads((tmp_path / EMBEDDER_META_FILE).read_text())
+  assert stored == embedder_info(emb)
+  assert stored["dim"] == 2
+  check_index_embedder(str(tmp_path), emb, 5)
+
+  for other in (
+    make(PooledSession(), max_length=256, fingerprint="bbb"),
+    make(PooledSession(), max_length=128, fingerprint="aaa"),
+    StubOpenAI(),
+  ):
+    with pytest.raises(ValueError, match="built with"):
+      check_index_embedder(str(tmp_path), other, 5)